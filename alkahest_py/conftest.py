@@ -0,0 +1,134 @@
+"""
+Shared pytest fixtures for the oracle and client test suites
+"""
+import asyncio
+import sys
+import time
+from types import MappingProxyType
+import pytest
+import pytest_asyncio
+from alkahest_py import (
+    EnvTestManager,
+    MockERC20,
+    TrustedOracleArbiterDemandData,
+)
+
+# Lifetime of escrows created by the fixtures, in seconds
+EXPIRATION_DELTA = 3600
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when it is installed (not available on Windows)"""
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.EventLoopPolicy()
+    return asyncio.get_event_loop_policy()
+
+
+@pytest.fixture(scope="module")
+def env():
+    """
+    One test environment (anvil node, deployed contracts, funded wallets) per test module.
+
+    The chain is shared by the tests of one module, so scans with
+    ``skip_arbitrated=False, only_new=False`` also re-arbitrate requests made by
+    earlier tests in that module (never by other modules). Tests that inspect
+    arbitration results must only look at decisions for the fulfillments they
+    created themselves. The node is torn down when the manager is dropped after
+    the module finishes.
+    """
+    return EnvTestManager()
+
+
+@pytest.fixture(scope="module")
+def mock_erc20_a(env):
+    """Mock ERC20 A bound to the god wallet, used to fund test accounts"""
+    return MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
+
+
+@pytest.fixture(scope="module")
+def extract_obligation(env):
+    """
+    Memoized ``extract_obligation_data`` keyed by attestation UID.
+
+    Decision functions may see the same attestation more than once (re-arbitration,
+    repeated arbitration requests); UIDs are unique on the module's chain, so the
+    decoded string can be reused for the whole module.
+    """
+    cache = {}
+    decode = env.bob_client.extract_obligation_data
+
+    def extract(attestation):
+        obligation_str = cache.get(attestation.uid)
+        if obligation_str is None:
+            obligation_str = decode(attestation)
+            cache[attestation.uid] = obligation_str
+        return obligation_str
+
+    return extract
+
+
+@pytest.fixture(scope="module")
+def empty_bob_demand_bytes(env):
+    """Encoded TrustedOracleArbiter demand naming Bob as oracle with no payload"""
+    return TrustedOracleArbiterDemandData(env.bob, []).encode_self()
+
+
+@pytest.fixture(scope="module")
+def price_100_a(env):
+    """Read-only escrow price of 100 ERC20 A"""
+    return MappingProxyType({"address": env.mock_addresses.erc20_a, "value": 100})
+
+
+@pytest.fixture(scope="module")
+def default_arbiter(env, empty_bob_demand_bytes):
+    """Read-only trusted oracle arbiter with Bob as oracle and an empty demand"""
+    return MappingProxyType({
+        "arbiter": env.addresses.arbiters_addresses.trusted_oracle_arbiter,
+        "demand": empty_bob_demand_bytes
+    })
+
+
+@pytest.fixture
+def make_escrow(env, mock_erc20_a, price_100_a, default_arbiter):
+    """
+    Factory for ERC20 escrows guarded by the trusted oracle arbiter.
+
+    Each call funds Alice with 100 of ERC20 A, escrows it behind the given
+    encoded demand (Bob with an empty demand by default) and returns the
+    escrow attestation UID.
+    """
+    expiration = int(time.time()) + EXPIRATION_DELTA
+
+    async def make(demand_bytes=None):
+        mock_erc20_a.transfer(env.alice, 100)
+
+        if demand_bytes is None:
+            arbiter = default_arbiter
+        else:
+            arbiter = {
+                "arbiter": env.addresses.arbiters_addresses.trusted_oracle_arbiter,
+                "demand": demand_bytes
+            }
+
+        escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
+            price_100_a, arbiter, expiration
+        )
+        return escrow_receipt['log']['uid']
+
+    return make
+
+
+@pytest_asyncio.fixture
+async def funded_escrow(env, make_escrow):
+    """Escrow with an empty oracle demand, plus Bob's oracle and string obligation clients"""
+    return {
+        "escrow_uid": await make_escrow(),
+        "oracle_client": env.bob_client.oracle,
+        "string_client": env.bob_client.string_obligation,
+    }
@@ -4,176 +4,64 @@ Test the Oracle arbitrate_past_sync functionality with simplified API
 """
 
 import pytest
-import time
-from alkahest_py import (
-    EnvTestManager,
-    StringObligationData,
-    ArbitrateOptions,
-    MockERC20,
-    TrustedOracleArbiterDemandData,
-)
+from alkahest_py import ArbitrateOptions
 
 @pytest.mark.asyncio
-async def test_arbitrate_past_sync():
-    """Test trivial arbitrate_past_sync: escrow → fulfillment → arbitration → collection"""
-    # Setup test environment
-    env = EnvTestManager()
-
-    # Setup escrow with proper oracle demand data
-    mock_erc20 = MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
-    mock_erc20.transfer(env.alice, 100)
-
-    price = {"address": env.mock_addresses.erc20_a, "value": 100}
-    trusted_oracle_arbiter = env.addresses.arbiters_addresses.trusted_oracle_arbiter
-
-    # Create proper demand data with Bob as the oracle
-    demand_data = TrustedOracleArbiterDemandData(env.bob, [])
-    demand_bytes = demand_data.encode_self()
-
-    arbiter = {
-        "arbiter": trusted_oracle_arbiter,
-        "demand": demand_bytes
-    }
-
-    expiration = int(time.time()) + 3600
-    escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
-        price, arbiter, expiration
-    )
-    escrow_uid = escrow_receipt['log']['uid']
-
-    # Make fulfillment obligation
-    string_client = env.bob_client.string_obligation
-    fulfillment_uid = await string_client.do_obligation("good", escrow_uid)
-
-    # Request arbitration
-    oracle_client = env.bob_client.oracle
-    await oracle_client.request_arbitration(fulfillment_uid, env.bob)
+@pytest.mark.parametrize(
+    "obligations,expected_approved",
+    [
+        (["good"], 1),
+        (["good", "bad"], 1),
+    ],
+    ids=["single_fulfillment", "conditional"],
+)
+async def test_arbitrate_past(env, funded_escrow, extract_obligation, obligations, expected_approved):
+    """
+    Test arbitrate_past_sync: escrow → fulfillments → arbitration → collection
+    Only 'good' obligations are approved, and a second pass with skip_arbitrated
+    must not re-arbitrate any of them.
+    """
+    escrow_uid = funded_escrow["escrow_uid"]
+    string_client = funded_escrow["string_client"]
+    oracle_client = funded_escrow["oracle_client"]
+
+    # Make fulfillments and request arbitration for each
+    # (kept sequential: all transactions are signed by Bob, and concurrent sends from one
+    # signer can be assigned the same pending nonce)
+    fulfillment_uids = set()
+    for obligation in obligations:
+        fulfillment_uid = await string_client.do_obligation(obligation, escrow_uid)
+        await oracle_client.request_arbitration(fulfillment_uid, env.bob)
+        fulfillment_uids.add(fulfillment_uid)
 
-    # Decision function that approves "good" obligations
+    # Decision function that approves only "good" obligations
     def decision_function(attestation):
         """Decision function receives attestation and extracts obligation data"""
-        obligation_str = env.bob_client.extract_obligation_data(attestation)
+        obligation_str = extract_obligation(attestation)
         print(f"Decision function called with obligation: {obligation_str}")
         return obligation_str == "good"
 
-    # Call arbitrate_past_sync with simplified API
+    # Arbitrate all past requests
     options = ArbitrateOptions(skip_arbitrated=False, only_new=False)
     decisions = await oracle_client.arbitrate_past_sync(decision_function, options)
+    decisions = [d for d in decisions if d.attestation.uid in fulfillment_uids]
 
-    # Verify arbitration found decisions
-    assert len(decisions) == 1, f"Expected 1 decision, got {len(decisions)}"
-    assert decisions[0].decision == True, f"Expected decision=True, got {decisions[0].decision}"
-
-    # Collect payment
-    collection_receipt = await env.bob_client.erc20.collect_escrow(
-        escrow_uid, fulfillment_uid
-    )
-
-    # Verify collection receipt
-    assert collection_receipt is not None, "Collection receipt should not be None"
-    print(f"✅ Arbitrate decision passed. Tx: {collection_receipt}")
-
-@pytest.mark.asyncio
-async def test_conditional_arbitrate_past():
-    """Test conditional arbitrate_past_sync: approve only 'good' obligations"""
-    # Setup test environment
-    env = EnvTestManager()
-
-    # Setup escrow
-    mock_erc20 = MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
-    mock_erc20.transfer(env.alice, 100)
-
-    price = {"address": env.mock_addresses.erc20_a, "value": 100}
-    trusted_oracle_arbiter = env.addresses.arbiters_addresses.trusted_oracle_arbiter
-
-    demand_data = TrustedOracleArbiterDemandData(env.bob, [])
-    demand_bytes = demand_data.encode_self()
-
-    arbiter = {
-        "arbiter": trusted_oracle_arbiter,
-        "demand": demand_bytes
-    }
-
-    expiration = int(time.time()) + 3600
-    escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
-        price, arbiter, expiration
-    )
-    escrow_uid = escrow_receipt['log']['uid']
-
-    # Make two fulfillments: one good, one bad
-    string_client = env.bob_client.string_obligation
-    good_fulfillment = await string_client.do_obligation("good", escrow_uid)
-    bad_fulfillment = await string_client.do_obligation("bad", escrow_uid)
-
-    # Request arbitration for both
-    oracle_client = env.bob_client.oracle
-    await oracle_client.request_arbitration(good_fulfillment, env.bob)
-    await oracle_client.request_arbitration(bad_fulfillment, env.bob)
-
-    # Decision function that approves only "good" obligations
-    def decision_function(attestation):
-        obligation_str = env.bob_client.extract_obligation_data(attestation)
-        return obligation_str == "good"
-
-    # Arbitrate both
-    options = ArbitrateOptions(skip_arbitrated=False, only_new=False)
-    decisions = await oracle_client.arbitrate_past_sync(decision_function, options)
-
-    # Verify we got 2 decisions, only 1 approved
-    assert len(decisions) == 2, f"Expected 2 decisions, got {len(decisions)}"
+    # Verify one decision per fulfillment, only the good ones approved
+    assert len(decisions) == len(obligations), f"Expected {len(obligations)} decisions, got {len(decisions)}"
     approved = [d for d in decisions if d.decision]
-    assert len(approved) == 1, f"Expected 1 approved decision, got {len(approved)}"
-
-    print(f"✅ Conditional arbitration passed: {len(approved)}/2 approved")
-
-@pytest.mark.asyncio
-async def test_skip_arbitrated():
-    """Test skip_arbitrated option prevents re-arbitrating"""
-    # Setup test environment
-    env = EnvTestManager()
-
-    # Setup escrow
-    mock_erc20 = MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
-    mock_erc20.transfer(env.alice, 100)
-
-    price = {"address": env.mock_addresses.erc20_a, "value": 100}
-    trusted_oracle_arbiter = env.addresses.arbiters_addresses.trusted_oracle_arbiter
-
-    demand_data = TrustedOracleArbiterDemandData(env.bob, [])
-    demand_bytes = demand_data.encode_self()
-
-    arbiter = {
-        "arbiter": trusted_oracle_arbiter,
-        "demand": demand_bytes
-    }
-
-    expiration = int(time.time()) + 3600
-    escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
-        price, arbiter, expiration
-    )
-    escrow_uid = escrow_receipt['log']['uid']
-
-    # Make fulfillment
-    string_client = env.bob_client.string_obligation
-    fulfillment_uid = await string_client.do_obligation("good", escrow_uid)
-
-    # Request arbitration
-    oracle_client = env.bob_client.oracle
-    await oracle_client.request_arbitration(fulfillment_uid, env.bob)
-
-    # Decision function
-    def decision_function(attestation):
-        obligation_str = env.bob_client.extract_obligation_data(attestation)
-        return obligation_str == "good"
-
-    # First arbitration
-    options = ArbitrateOptions(skip_arbitrated=False, only_new=False)
-    decisions = await oracle_client.arbitrate_past_sync(decision_function, options)
-    assert len(decisions) == 1, "First arbitration should find 1 decision"
+    assert len(approved) == expected_approved, f"Expected {expected_approved} approved decisions, got {len(approved)}"
 
     # Second arbitration with skip_arbitrated should find nothing
     options_skip = ArbitrateOptions(skip_arbitrated=True, only_new=False)
     decisions2 = await oracle_client.arbitrate_past_sync(decision_function, options_skip)
+    decisions2 = [d for d in decisions2 if d.attestation.uid in fulfillment_uids]
     assert len(decisions2) == 0, "Second arbitration with skip_arbitrated should find 0 decisions"
 
-    print("✅ Skip arbitrated option works correctly")
\ No newline at end of file
+    # Collect payment with the approved fulfillment
+    collection_receipt = await env.bob_client.erc20.collect_escrow(
+        escrow_uid, approved[0].attestation.uid
+    )
+
+    # Verify collection receipt
+    assert collection_receipt is not None, "Collection receipt should not be None"
+    print(f"✅ Arbitrate past passed: {len(approved)}/{len(obligations)} approved. Tx: {collection_receipt}")
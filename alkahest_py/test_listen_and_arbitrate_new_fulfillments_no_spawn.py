@@ -4,44 +4,14 @@ Test the Oracle listen_and_arbitrate_no_spawn functionality with only_new flag
 """
 
 import pytest
-import time
-from alkahest_py import (
-    EnvTestManager,
-    ArbitrateOptions,
-    MockERC20,
-    TrustedOracleArbiterDemandData,
-)
+from alkahest_py import ArbitrateOptions
 
 @pytest.mark.asyncio
-async def test_listen_and_arbitrate_new_fulfillments_no_spawn():
+async def test_listen_and_arbitrate_new_fulfillments_no_spawn(env, funded_escrow, extract_obligation):
     """Test listen_and_arbitrate with only_new=True: only processes new fulfillments"""
-    # Setup test environment
-    env = EnvTestManager()
-
-    # Setup escrow
-    mock_erc20 = MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
-    mock_erc20.transfer(env.alice, 100)
-
-    price = {"address": env.mock_addresses.erc20_a, "value": 100}
-    trusted_oracle_arbiter = env.addresses.arbiters_addresses.trusted_oracle_arbiter
-
-    demand_data = TrustedOracleArbiterDemandData(env.bob, [])
-    demand_bytes = demand_data.encode_self()
-
-    arbiter = {
-        "arbiter": trusted_oracle_arbiter,
-        "demand": demand_bytes
-    }
-
-    expiration = int(time.time()) + 3600
-    escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
-        price, arbiter, expiration
-    )
-    escrow_uid = escrow_receipt['log']['uid']
-
     # Decision function
     def decision_function(attestation):
-        obligation_str = env.bob_client.extract_obligation_data(attestation)
+        obligation_str = extract_obligation(attestation)
         print(f"Arbitrating obligation: {obligation_str}")
         return obligation_str == "good"
 
@@ -53,7 +23,7 @@ async def test_listen_and_arbitrate_new_fulfillments_no_spawn():
 
     # Start listening with only_new=True (should not process past arbitrations)
     # Note: This test is timing-dependent and may be flaky
-    oracle_client = env.bob_client.oracle
+    oracle_client = funded_escrow["oracle_client"]
     options = ArbitrateOptions(skip_arbitrated=False, only_new=True)
 
     # With only_new=True and short timeout, should process 0 past decisions
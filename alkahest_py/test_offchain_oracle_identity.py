@@ -2,13 +2,13 @@
 Test contextless offchain identity oracle flow
 """
 import pytest
-import json
+import orjson
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict
 from eth_account import Account
 from eth_account.messages import encode_defunct
 from alkahest_py import (
-    EnvTestManager,
     ArbitrateOptions,
     AlkahestClient,
 )
@@ -22,11 +22,34 @@ class IdentityFulfillment:
     signature: str
 
 
+# Deterministic identity key, generated once at import so failures are reproducible
+_IDENTITY_ACCOUNT = Account.from_key("0x" + "1" * 64)
+
 # Global identity registry for tracking nonces
 identity_registry: Dict[str, int] = {}
 
 
-def verify_identity_decision(attestation, client) -> bool:
+@pytest.fixture
+def reset_identity_registry():
+    """Start and finish each test with an empty identity registry"""
+    identity_registry.clear()
+    yield identity_registry
+    identity_registry.clear()
+
+
+@lru_cache(maxsize=1024)
+def _recover(message: str, signature: bytes) -> str:
+    """
+    Recover the lowercased signer address of an EIP-191 message.
+
+    Recovery is a full secp256k1 operation, so results are cached for replayed
+    (message, signature) pairs. eth-keys uses coincurve for it when installed.
+    """
+    encoded_message = encode_defunct(text=message)
+    return Account.recover_message(encoded_message, signature=signature).lower()
+
+
+def verify_identity_decision(attestation, oracle) -> bool:
     """
     Verify an identity fulfillment by checking:
     1. The signature is valid
@@ -35,8 +58,15 @@ def verify_identity_decision(attestation, client) -> bool:
     """
     try:
         # Extract obligation data
-        obligation_str = client.oracle.extract_obligation_data(attestation)
-        payload = json.loads(obligation_str)
+        obligation_str = oracle.extract_obligation_data(attestation)
+
+        # Cheap structural checks so obvious garbage never reaches the JSON parser
+        if not obligation_str or obligation_str[0] != "{" or len(obligation_str) < 50:
+            return False
+        if '"pubkey"' not in obligation_str:
+            return False
+
+        payload = orjson.loads(obligation_str)
 
         parsed = IdentityFulfillment(
             pubkey=payload['pubkey'],
@@ -45,32 +75,31 @@ def verify_identity_decision(attestation, client) -> bool:
             signature=payload['signature']
         )
 
-        # Check if address is registered
+        # Check if address is registered and the nonce is greater than current
         pubkey_lower = parsed.pubkey.lower()
-        if pubkey_lower not in identity_registry:
+        current_nonce = identity_registry.get(pubkey_lower)
+        if current_nonce is None:
             return False
-
-        # Check nonce is greater than current
-        current_nonce = identity_registry[pubkey_lower]
         if parsed.nonce <= current_nonce:
             return False
 
-        # Verify signature length (130 hex chars without 0x, or 132 with 0x)
-        sig_len = len(parsed.signature) if parsed.signature else 0
-        if not parsed.signature or sig_len not in [130, 132]:
+        # Decode the signature once; it must be the canonical 65-byte (r, s, v) form
+        signature = parsed.signature
+        try:
+            sig_bytes = bytes.fromhex(signature[2:] if signature.startswith("0x") else signature)
+        except (AttributeError, ValueError):
+            return False
+        if len(sig_bytes) != 65:
             return False
 
         # Verify signature
-        message = f"{parsed.data}:{parsed.nonce}"
-        encoded_message = encode_defunct(text=message)
-
         try:
-            recovered = Account.recover_message(encoded_message, signature=parsed.signature)
+            recovered = _recover(f"{parsed.data}:{parsed.nonce}", sig_bytes)
         except Exception:
             return False
 
         # Check recovered address matches claimed pubkey
-        if recovered.lower() != pubkey_lower:
+        if recovered != pubkey_lower:
             return False
 
         # Update nonce
@@ -94,32 +123,24 @@ async def create_identity_payload(account: Account, nonce: int, data: str = "pro
         signature=signed.signature.hex()
     )
 
-    return json.dumps({
-        "pubkey": payload.pubkey,
-        "nonce": payload.nonce,
-        "data": payload.data,
-        "signature": payload.signature
-    })
+    return orjson.dumps(payload).decode('utf-8')
 
 
 @pytest.mark.asyncio
-async def test_contextless_offchain_identity_oracle_flow():
+async def test_contextless_offchain_identity_oracle_flow(env, reset_identity_registry):
     """
     Test a contextless identity verification oracle
     Uses signature verification and nonce tracking without requiring escrow.
     Tests both successful verification and replay attack prevention.
     """
-    env = EnvTestManager()
-
     # Simplification: Bob acts as the oracle
     oracle_address = env.bob
     oracle_client = env.bob_client
+    oracle = oracle_client.oracle
+    string_obligation = oracle_client.string_obligation
 
-    # Clear and setup identity registry
-    identity_registry.clear()
-
-    # Create a random identity account
-    identity_account = Account.create()
+    # Use the module-level identity account
+    identity_account = _IDENTITY_ACCOUNT
     identity_address = identity_account.address.lower()
 
     # Register the identity with nonce 0
@@ -127,33 +148,34 @@ async def test_contextless_offchain_identity_oracle_flow():
 
     # Define decision function using closure to access registry
     def decision_function(attestation):
-        return verify_identity_decision(attestation, oracle_client)
+        return verify_identity_decision(attestation, oracle)
 
     def callback(decision):
         pass
 
     # Test 1: Valid identity proof with nonce 1 (should succeed)
     good_payload = await create_identity_payload(identity_account, 1)
-    good_uid = await env.bob_client.string_obligation.do_obligation(
+    good_uid = await string_obligation.do_obligation(
         good_payload,
         None  # No escrow reference (contextless)
     )
 
     # Request arbitration
-    await env.bob_client.oracle.request_arbitration(good_uid, oracle_address)
+    await oracle.request_arbitration(good_uid, oracle_address)
 
     # Process the arbitration (skip already arbitrated items)
     options = ArbitrateOptions(skip_arbitrated=True, only_new=False)
-    result1 = await oracle_client.oracle.listen_and_arbitrate_no_spawn(
+    result1 = await oracle.listen_and_arbitrate_no_spawn(
         decision_function,
         callback,
         options,
-        timeout_seconds=2.0
+        timeout_seconds=1.0  # No new events expected; only past requests are processed
     )
+    decisions1 = [d for d in result1.decisions if d.attestation.uid == good_uid]
 
     # Verify the first decision was approval
-    assert len(result1.decisions) >= 1, "Expected at least 1 decision"
-    first_decision = result1.decisions[0].decision
+    assert len(decisions1) >= 1, "Expected at least 1 decision"
+    first_decision = decisions1[0].decision
     assert first_decision is True, "Expected first decision to be True"
 
     # Verify nonce was updated
@@ -161,29 +183,27 @@ async def test_contextless_offchain_identity_oracle_flow():
 
     # Test 2: Replay attack with same nonce (should fail)
     bad_payload = await create_identity_payload(identity_account, 1)  # Same nonce
-    bad_uid = await env.bob_client.string_obligation.do_obligation(
+    bad_uid = await string_obligation.do_obligation(
         bad_payload,
         None
     )
 
     # Request arbitration
-    await env.bob_client.oracle.request_arbitration(bad_uid, oracle_address)
+    await oracle.request_arbitration(bad_uid, oracle_address)
 
     # Process the arbitration (skip already arbitrated, so only process the new one)
-    result2 = await oracle_client.oracle.listen_and_arbitrate_no_spawn(
+    result2 = await oracle.listen_and_arbitrate_no_spawn(
         decision_function,
         callback,
         options,
-        timeout_seconds=2.0
+        timeout_seconds=1.0  # No new events expected; only past requests are processed
     )
+    decisions2 = [d for d in result2.decisions if d.attestation.uid == bad_uid]
 
     # Verify the second decision was rejection
     # Should only have one decision (the new bad one)
-    assert len(result2.decisions) >= 1, "Expected at least 1 decision"
-    second_decision = result2.decisions[0].decision
+    assert len(decisions2) >= 1, "Expected at least 1 decision"
+    second_decision = decisions2[0].decision
     assert second_decision is False, "Expected second decision to be False (replay attack)"
 
-    # Cleanup
-    identity_registry.clear()
-
     print("✅ Contextless offchain identity oracle test passed")
@@ -1,19 +1,19 @@
 """
 Test asynchronous offchain oracle uptime monitoring flow (simplified)
 """
+import asyncio
 import pytest
-import json
+import orjson
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 from alkahest_py import (
-    EnvTestManager,
-    MockERC20,
     TrustedOracleArbiterDemandData,
     ArbitrateOptions,
 )
 
 
-@dataclass
+@dataclass(frozen=True)
 class UptimeDemand:
     service_url: str
     min_uptime: float
@@ -22,27 +22,25 @@ class UptimeDemand:
     check_interval_secs: int
 
 
-@pytest.mark.asyncio
-async def test_asynchronous_offchain_oracle_uptime_flow():
-    """
-    Test an asynchronous offchain oracle that monitors service uptime
-    Alice escrows payment for uptime monitoring service.
-    Bob claims to provide the service at a URL.
-    Charlie monitors the service asynchronously and arbitrates.
-    Bob collects payment if uptime meets the threshold.
-    """
-    env = EnvTestManager()
+@lru_cache(maxsize=128)
+def _encode_demand(demand: UptimeDemand) -> bytes:
+    """JSON-encode an uptime demand; orjson serializes dataclasses natively"""
+    return orjson.dumps(demand)
 
-    # Simplification: Bob acts as the oracle
-    oracle_address = env.bob
-    oracle_client = env.bob_client
 
-    # Step 1: Alice escrows ERC20 with uptime demand
-    mock_erc20 = MockERC20(env.mock_addresses.erc20_a, env.god_wallet_provider)
-    mock_erc20.transfer(env.alice, 100)
+def _simulated_uptime(start: int, end: int, check_interval_secs: int, failures: int) -> float:
+    """Uptime ratio over the checks scheduled between start and end, with `failures` failed checks"""
+    total_span = max(end - start, 1)
+    interval = max(check_interval_secs, 1)
+    checks = max(total_span // interval, 1)
+    return (checks - failures) / checks
+
 
+@pytest.fixture(scope="module")
+def uptime_demand():
+    """Uptime demand for a service window starting now"""
     now = int(time.time())
-    demand_payload = UptimeDemand(
+    return UptimeDemand(
         service_url="https://uptime.hyperspace",
         min_uptime=0.75,
         start=now,
@@ -50,87 +48,101 @@ async def test_asynchronous_offchain_oracle_uptime_flow():
         check_interval_secs=2
     )
 
-    demand_data = TrustedOracleArbiterDemandData(
-        oracle_address,
-        json.dumps({
-            "service_url": demand_payload.service_url,
-            "min_uptime": demand_payload.min_uptime,
-            "start": demand_payload.start,
-            "end": demand_payload.end,
-            "check_interval_secs": demand_payload.check_interval_secs
-        }).encode('utf-8')
-    )
-    demand_bytes = demand_data.encode_self()
 
-    arbiter = {
-        "arbiter": env.addresses.arbiters_addresses.trusted_oracle_arbiter,
-        "demand": demand_bytes
-    }
+@pytest.fixture(scope="module")
+def uptime_demand_bytes(env, uptime_demand):
+    """Uptime demand ABI-encoded for TrustedOracleArbiter with Bob as oracle"""
+    return TrustedOracleArbiterDemandData(env.bob, _encode_demand(uptime_demand)).encode_self()
 
-    price = {"address": env.mock_addresses.erc20_a, "value": 100}
-    expiration = now + 3600
 
-    escrow_receipt = await env.alice_client.erc20.permit_and_buy_with_erc20(
-        price, arbiter, expiration
-    )
-    escrow_uid = escrow_receipt['log']['uid']
+@pytest.mark.asyncio
+async def test_asynchronous_offchain_oracle_uptime_flow(env, make_escrow, uptime_demand, uptime_demand_bytes):
+    """
+    Test an asynchronous offchain oracle that monitors service uptime
+    Alice escrows payment for uptime monitoring service.
+    Bob claims to provide the service at a URL.
+    Charlie monitors the service asynchronously and arbitrates.
+    Bob collects payment if uptime meets the threshold.
+    """
+    # Simplification: Bob acts as the oracle
+    oracle_address = env.bob
+    oracle_client = env.bob_client
+    oracle = oracle_client.oracle
+    string_obligation = oracle_client.string_obligation
+
+    # Step 1: Alice escrows ERC20 with uptime demand
+    escrow_uid = await make_escrow(uptime_demand_bytes)
 
     # Step 2: Bob submits the service URL as fulfillment
-    service_url = demand_payload.service_url
-    fulfillment_uid = await env.bob_client.string_obligation.do_obligation(
+    service_url = uptime_demand.service_url
+    fulfillment_uid = await string_obligation.do_obligation(
         service_url,
         escrow_uid
     )
 
     # Step 3: Request arbitration
-    await env.bob_client.oracle.request_arbitration(fulfillment_uid, oracle_address)
+    await oracle.request_arbitration(fulfillment_uid, oracle_address)
 
     # Step 4: Oracle arbitrates using simulated uptime monitoring
-    async def decision_function(attestation):
-        """Simulate uptime monitoring and decide if service meets SLA"""
-        try:
-            # Extract service URL from fulfillment
-            statement = oracle_client.oracle.extract_obligation_data(attestation)
-
-            # Fetch escrow attestation from blockchain to get demand
-            escrow_attestation = await oracle_client.get_escrow_attestation(attestation)
-            demand_data_obj = oracle_client.oracle.extract_demand_data(escrow_attestation)
-            demand_json = json.loads(demand_data_obj.data.decode('utf-8'))
+    extract_obligation_data = oracle.extract_obligation_data
+    get_escrow_and_demand = oracle_client.get_escrow_and_demand
 
-            # Verify URL matches
-            if statement != demand_json['service_url']:
-                return False
+    async def extract(attestation):
+        """Extract the demand from the fulfillment's escrow and whether the fulfilled URL matches it"""
+        statement = extract_obligation_data(attestation)
 
-            # Simulate uptime checks using fetched demand
-            total_span = max(demand_json['end'] - demand_json['start'], 1)
-            interval = max(demand_json['check_interval_secs'], 1)
-            checks = max(total_span // interval, 1)
+        # Fetch escrow attestation from blockchain and decode its demand in one call
+        _, demand_data_obj = await get_escrow_and_demand(attestation)
+        demand = UptimeDemand(**orjson.loads(demand_data_obj.data))
+        return demand, statement == demand.service_url
 
-            # Simulate checks: fail one check (index 1)
-            successes = checks - 1  # One failure
-            uptime = successes / checks
+    # Re-arbitrations of the same fulfillment (skip_arbitrated=False) share one
+    # fetch and decode; concurrent calls await the same in-flight task.
+    extractions = {}
 
-            # Decide based on minimum uptime requirement
-            return uptime >= demand_json['min_uptime']
+    async def decision_function(attestation):
+        """Simulate uptime monitoring and decide if service meets SLA"""
+        uid = attestation.uid
+        task = extractions.get(uid)
+        if task is None:
+            task = extractions[uid] = asyncio.ensure_future(extract(attestation))
+        try:
+            demand, url_matches = await task
+        except (RuntimeError, ValueError, TypeError):
+            # RuntimeError: chain lookup failed; ValueError: ABI or JSON decode failed
+            # (orjson.JSONDecodeError is a ValueError); TypeError: demand fields don't
+            # match UptimeDemand. Drop the failed extraction so a later attempt can retry.
+            extractions.pop(uid, None)
+            return False
 
-        except Exception:
+        # Verify URL matches (compared once per fulfillment, with the extraction)
+        if not url_matches:
             return False
 
+        # Simulate uptime checks using fetched demand: fail one check (index 1)
+        uptime = _simulated_uptime(
+            demand.start, demand.end, demand.check_interval_secs, failures=1
+        )
+
+        # Decide based on minimum uptime requirement
+        return uptime >= demand.min_uptime
+
     def callback(decision):
         pass
 
     # Arbitrate
     options = ArbitrateOptions(skip_arbitrated=False, only_new=False)
-    result = await oracle_client.oracle.listen_and_arbitrate_no_spawn(
+    result = await oracle.listen_and_arbitrate_no_spawn(
         decision_function,
         callback,
         options,
         timeout_seconds=2.0
     )
+    decisions = [d for d in result.decisions if d.attestation.uid == fulfillment_uid]
 
     # Verify decision
-    assert len(result.decisions) >= 1, "Expected at least 1 decision"
-    assert result.decisions[0].decision == True, "Expected uptime check to pass"
+    assert len(decisions) >= 1, "Expected at least 1 decision"
+    assert decisions[0].decision == True, "Expected uptime check to pass"
 
     # Step 5: Bob collects the escrowed payment
     await env.bob_client.erc20.collect_escrow(escrow_uid, fulfillment_uid)